@@ -31,9 +31,43 @@ import logging
 _LOG = logging.getLogger(__name__)
 Loader = Callable[[Path], Any]
 
+def _pyarrow_engine() -> Dict[str, str]:
+    """``read_csv`` kwargs selecting the multithreaded pyarrow engine, empty
+    when unavailable.
+
+    Needs both pyarrow itself and a pandas that knows about the engine
+    (1.4+); on older pandas passing ``engine="pyarrow"`` raises
+    ``ValueError: Unknown engine`` for every read.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return {}
+    try:
+        pandas_version = tuple(int(part) for part in pd.__version__.split(".")[:2])
+    except ValueError:
+        return {}
+    if pandas_version >= (1, 4):
+        return {"engine": "pyarrow"}
+    return {}
+
+
+_PYARROW_ENGINE = _pyarrow_engine()
+
+
+def _read_plain_csv(fp, **kwargs):
+    """Read a CSV with pandas' multithreaded pyarrow engine when pyarrow is
+    installed.
+
+    Only suitable for loads without ``converters`` or ``parse_dates``, which
+    the pyarrow engine doesn't support; presetting ``dtype`` on the callers
+    also skips the parser's type-inference pass.
+    """
+    return pd.read_csv(fp, **kwargs, **_PYARROW_ENGINE)
+
 
 def _read_video_info(fp):
-    df = pd.read_csv(fp, index_col="video")
+    df = _read_plain_csv(fp, index_col="video")
     df.index.name = "video_id"
     return df
 
@@ -51,18 +85,26 @@ _file_loaders = {
         ).index.values
     ),
     "EPIC_many_shot_verbs.csv": lambda fp: set(
-        pd.read_csv(fp, index_col="verb_class").index.values
+        _read_plain_csv(
+            fp, index_col="verb_class", dtype={"verb_class": "int64"}
+        ).index.values
     ),
     "EPIC_many_shot_nouns.csv": lambda fp: set(
-        pd.read_csv(fp, index_col="noun_class").index.values
+        _read_plain_csv(
+            fp, index_col="noun_class", dtype={"noun_class": "int64"}
+        ).index.values
     ),
     "EPIC_descriptions.csv": lambda fp: pd.read_csv(
         fp, index_col="video_id", parse_dates={"datetime": ["date", "time"]}
     ),
     "EPIC_video_info.csv": _read_video_info,
-    "EPIC_train_action_narrations.csv": lambda fp: pd.read_csv(fp),
+    "EPIC_train_action_narrations.csv": lambda fp: _read_plain_csv(
+        fp, dtype={"participant_id": str, "video_id": str, "narration": str}
+    ),
     "EPIC_train_object_labels.csv": lambda fp: pd.read_csv(
-        fp, converters={"bounding_boxes": literal_eval}
+        fp,
+        converters={"bounding_boxes": literal_eval},
+        dtype={"noun_class": "int32", "frame": "int64"},
     ),
 }
 
@@ -92,6 +134,10 @@ class AnnotationRepository:
 
     @local_dir.setter
     def local_dir(self, dir_: Path):
+        if dir_ != self.http_folder.local_dir:
+            # The inverse lookups are derived from the parsed class files, so
+            # they go stale together with the HttpFolder's parsed-file cache.
+            self.inverse_lookups = {"verb": None, "noun": None}
         self.http_folder.local_dir = dir_
 
     def inverse_noun_lookup(self):
@@ -177,10 +223,23 @@ class Loaders:
 class HttpFolder:
     def __init__(self, base_url: str, local_dir: Path, loaders: Loaders) -> None:
         self.base_url = base_url
-        # TODO: Invalidate `files` cache when this is changed
-        self.local_dir = local_dir
+        self._local_dir = local_dir
         self.loaders = loaders
-        self.files = dict()  # type: Dict[str, Loader]
+        # Parsed files memoized by name, so repeat loads are dict hits
+        # rather than disk reads + CSV parses.
+        self.files = dict()  # type: Dict[str, Any]
+
+    @property
+    def local_dir(self) -> Path:
+        return self._local_dir
+
+    @local_dir.setter
+    def local_dir(self, dir_: Path) -> None:
+        # Pointing at a different directory invalidates everything parsed
+        # from the old one.
+        if dir_ != self._local_dir:
+            self.files.clear()
+        self._local_dir = dir_
 
     def load_file(self, name: str) -> Any:
         if name not in self.files:
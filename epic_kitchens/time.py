@@ -1,5 +1,6 @@
 """Functions for converting between frames and timestamps"""
 import numpy as np
+import pandas as pd
 
 _MINUTES_TO_SECONDS = 60
 _HOURS_TO_SECONDS = 60 * 60
@@ -31,6 +32,54 @@ def timestamp_to_seconds(timestamp: str) -> float:
     return total_seconds
 
 
+def timestamps_to_seconds(timestamps: pd.Series) -> np.ndarray:
+    """ Convert a series of timestamps into total number of seconds
+
+    Vectorized equivalent of applying :py:func:`timestamp_to_seconds` per row,
+    converting an entire annotation column in C rather than one python call
+    per timestamp.
+
+    Args:
+        timestamps: series of timestamps formatted as ``HH:MM:SS[.FractionalPart]``
+
+    Returns:
+        1D array of ``timestamps`` converted to seconds
+
+    Examples:
+        >>> timestamps_to_seconds(pd.Series(["00:00:00", "00:01:05.5", "01:01:05.5"]))
+        array([   0. ,   65.5, 3665.5])
+    """
+    parts = timestamps.str.split(":", expand=True).to_numpy(dtype=np.float64)
+    return (
+        parts[:, 0] * _HOURS_TO_SECONDS
+        + parts[:, 1] * _MINUTES_TO_SECONDS
+        + parts[:, 2]
+    )
+
+
+def timestamps_to_frames(timestamps: pd.Series, fps: float) -> np.ndarray:
+    """ Convert a series of timestamps to frame numbers given the FPS of the
+    extracted frames
+
+    Vectorized equivalent of applying :py:func:`timestamp_to_frame` per row.
+
+    Args:
+        timestamps: series of timestamps formatted as ``HH:MM:SS[.FractionalPart]``
+        fps: frames per second
+
+    Returns:
+        1D array of frames corresponding to ``timestamps``
+
+    Examples:
+        >>> timestamps_to_frames(pd.Series(["00:00:00", "00:00:01", "00:01:00"]), 60)
+        array([   1,   60, 3600])
+        >>> timestamps_to_frames(pd.Series(["00:00:01"]), 29.97)
+        array([29])
+    """
+    seconds = timestamps_to_seconds(timestamps)
+    return np.where(seconds == 0, 1, (seconds * fps).astype(np.int64))
+
+
 def seconds_to_timestamp(total_seconds: float) -> str:
     """ Convert seconds into a timestamp
 
@@ -56,10 +105,13 @@ def seconds_to_timestamp(total_seconds: float) -> str:
         >>> seconds_to_timestamp(1225.78500002)
         '00:20:25.785'
     """
-    ss = total_seconds % 60
-    mm = np.floor((total_seconds / 60) % 60)
-    hh = np.floor((total_seconds / (60 * 60)))
-    return "{:02.0f}:{:02.0f}:{:0.3f}".format(hh, mm, ss)
+    # Native integer arithmetic on milliseconds avoids the numpy dispatch
+    # overhead of np.floor on python scalars, which dominates when converting
+    # hundreds of thousands of annotations.
+    total_milliseconds = int(round(total_seconds * 1000))
+    hh, remainder = divmod(total_milliseconds, _HOURS_TO_SECONDS * 1000)
+    mm, remainder = divmod(remainder, _MINUTES_TO_SECONDS * 1000)
+    return "{:02d}:{:02d}:{:0.3f}".format(hh, mm, remainder / 1000)
 
 
 def timestamp_to_frame(timestamp: str, fps: float) -> int:
@@ -131,4 +183,6 @@ def flow_frame_count(rgb_frame: int, stride: int, dilation: int) -> int:
         >>> flow_frame_count(7, 1, 3)
         4
     """
-    return int(np.ceil((float(rgb_frame) - dilation) / stride))
+    # Integer ceil-division; avoids the numpy dispatch cost of np.ceil on a
+    # python scalar inside per-segment loops.
+    return -(-(rgb_frame - dilation) // stride)
@@ -9,7 +9,7 @@ import pandas as pd
 from typing import Tuple, Iterator, List, Iterable
 
 from epic_kitchens.labels import NARRATION_COL, START_TS_COL, STOP_TS_COL, VIDEO_ID_COL
-from epic_kitchens.time import timestamp_to_frame
+from epic_kitchens.time import timestamp_to_frame, timestamps_to_frames
 
 LOG = logging.getLogger(__name__)
 
@@ -30,6 +30,26 @@ class ModalityIterator(ABC):
         """
         raise NotImplementedError
 
+    def frame_indices(self, timestamps: pd.Series) -> np.ndarray:
+        """Convert a series of timestamps to frame indices in one vectorized
+        pass; the counterpart of the per-timestamp conversion inside
+        :py:meth:`frame_iterator`.
+
+        Args:
+            timestamps: series of timestamps (``HH:MM:SS[.FractionalPart]``)
+
+        Returns:
+            1D array of frame indices corresponding to ``timestamps``
+        """
+        raise NotImplementedError
+
+    def frame_iterator_from_indices(
+        self, start_frame: int, stop_frame: int
+    ) -> Iterable[int]:
+        """Like :py:meth:`frame_iterator`, but over frame indices already
+        converted by :py:meth:`frame_indices`."""
+        return range(start_frame, stop_frame)
+
 
 class RGBModalityIterator(ModalityIterator):
     """Iterator for RGB frames"""
@@ -42,6 +62,9 @@ class RGBModalityIterator(ModalityIterator):
         stop_frame = timestamp_to_frame(stop, self.fps)
         return range(start_frame, stop_frame)
 
+    def frame_indices(self, timestamps: pd.Series) -> np.ndarray:
+        return timestamps_to_frames(timestamps, self.fps)
+
 
 class FlowModalityIterator(ModalityIterator):
     """Iterator for optical flow :math:`(u, v)` frames"""
@@ -64,9 +87,13 @@ class FlowModalityIterator(ModalityIterator):
         stop_frame = self._seconds_to_flow_frame_index(stop)
         return range(start_frame, stop_frame)
 
+    def frame_indices(self, timestamps: pd.Series) -> np.ndarray:
+        rgb_frame_indices = timestamps_to_frames(timestamps, self.rgb_fps)
+        return -(-rgb_frame_indices // self.stride)
+
     def _seconds_to_flow_frame_index(self, timestamp: str):
         rgb_frame_index = timestamp_to_frame(timestamp, self.rgb_fps)
-        return int(np.ceil(rgb_frame_index / self.stride))
+        return -(-rgb_frame_index // self.stride)
 
 
 def iterate_frame_dir(root: Path) -> Iterator[Tuple[Path, Path]]:
@@ -78,9 +105,17 @@ def iterate_frame_dir(root: Path) -> Iterator[Tuple[Path, Path]]:
     Yields:
         (person_dir, video_dir)
     """
-    for person_dir in root.iterdir():
-        for video_dir in person_dir.iterdir():
-            yield (person_dir, video_dir)
+    # os.scandir caches the entry type from the directory listing itself,
+    # avoiding the per-entry stat and Path allocation Path.iterdir pays.
+    # Iterated plainly rather than as a context manager, which scandir only
+    # grew in python 3.6; exhausting the iterator closes it.
+    for person_entry in os.scandir(str(root)):
+        if not person_entry.is_dir():
+            continue
+        person_dir = Path(person_entry.path)
+        for video_entry in os.scandir(person_entry.path):
+            if video_entry.is_dir():
+                yield (person_dir, Path(video_entry.path))
 
 
 def split_dataset_frames(
@@ -109,11 +144,18 @@ def split_dataset_frames(
     segment_root_dir.mkdir(exist_ok=True, parents=True)
     segment_root_dir = segment_root_dir.resolve()
 
+    # Group the annotations by video once up front: a boolean mask over the
+    # full dataframe per video directory would rescan all annotations for
+    # every video.
+    annotations_by_video = {
+        video_id: video_annotations
+        for video_id, video_annotations in annotations.groupby(VIDEO_ID_COL, sort=False)
+    }
     for person_dir, video_dir in iterate_frame_dir(frames_dir):
         if pattern.search(str(video_dir)):
-            annotations_for_video = annotations[
-                annotations[VIDEO_ID_COL] == video_dir.name
-            ]
+            annotations_for_video = annotations_by_video.get(video_dir.name)
+            if annotations_for_video is None:
+                continue
             split_video_frames(
                 modality_iterator,
                 frame_format,
@@ -150,7 +192,14 @@ def split_video_frames(
         segment_root_dir: Directory to write split segments to
         video_dir: Directory containing dumped frames for a single video
     """
-    for annotation in video_annotations.itertuples():
+    # Convert the start/stop timestamp columns to frame indices in two
+    # vectorized passes up front rather than parsing a pair of timestamp
+    # strings per annotation inside the loop.
+    start_frames = modality_iterator.frame_indices(video_annotations[START_TS_COL])
+    stop_frames = modality_iterator.frame_indices(video_annotations[STOP_TS_COL])
+    for annotation, start_frame, stop_frame in zip(
+        video_annotations.itertuples(), start_frames, stop_frames
+    ):
         segment_dir_name = "{video_id}_{index}_{narration}".format(
             index=annotation.Index,
             video_id=getattr(annotation, VIDEO_ID_COL),
@@ -160,8 +209,8 @@ def split_video_frames(
         segment_dir.mkdir(parents=True, exist_ok=True)
         start_timestamp = getattr(annotation, START_TS_COL)
         stop_timestamp = getattr(annotation, STOP_TS_COL)
-        frame_iterator = modality_iterator.frame_iterator(
-            start_timestamp, stop_timestamp
+        frame_iterator = modality_iterator.frame_iterator_from_indices(
+            start_frame, stop_frame
         )
 
         LOG.info(
@@ -175,33 +224,64 @@ def split_video_frames(
         _split_frames_by_segment(frame_format, frame_iterator, segment_dir, video_dir)
 
 
+# Only zero-padded (or unpadded) %d conversions take the zfill fast path:
+# space padding as in "%10d" renders differently and must go through %.
+_FRAME_FORMAT_PATTERN = re.compile(r"(.*)%(?:0(\d+))?d(.*)")
+
+
+def _frame_filename_builder(frame_format: str):
+    """Build a function mapping a frame index to its filename, equivalent to
+    ``frame_format % index`` but without reparsing the format string per frame
+    (``str.zfill`` on the index is considerably cheaper than the ``%``
+    operator in the per-frame linking loop)."""
+    match = _FRAME_FORMAT_PATTERN.fullmatch(frame_format)
+    if match is None:
+        return lambda frame_index: frame_format % frame_index
+    prefix, width, suffix = match.groups()
+    width = int(width) if width else 0
+
+    def build_frame_filename(frame_index: int) -> str:
+        return prefix + str(frame_index).zfill(width) + suffix
+
+    return build_frame_filename
+
+
 def _split_frames_by_segment(
     frame_format: str, frame_iterator, segment_dir: Path, video_dir: Path
 ):
     segment_dir_fd = os.open(str(segment_dir), os.O_RDONLY)
     try:
+        # Every frame in the segment shares the same relative path prefix and
+        # lives in the same source directory, so compute the prefix and list
+        # the directory once rather than calling relpath and stat per frame.
+        source_dir_relative_path = os.path.relpath(
+            str(video_dir), start=str(segment_dir)
+        )
+        # Not used as a context manager: scandir only supports that from
+        # python 3.6, and the exhausted iterator closes itself.
+        source_frame_filenames = {
+            entry.name for entry in os.scandir(str(video_dir))
+        }
+        frame_filename = _frame_filename_builder(frame_format)
         first_frame_index = -1
         last_frame_index = -1
         for frame_index in frame_iterator:
             if first_frame_index == -1:
                 first_frame_index = frame_index
-            source_frame_filename = frame_format % frame_index
-            target_frame_filename = frame_format % (frame_index - first_frame_index + 1)
-            source_frame_path = video_dir.joinpath(source_frame_filename)
-            segmented_frame_path = segment_dir.joinpath(target_frame_filename)
+            source_frame_filename = frame_filename(frame_index)
+            target_frame_filename = frame_filename(frame_index - first_frame_index + 1)
             assert (
-                source_frame_path.exists()
+                source_frame_filename in source_frame_filenames
             ), "{source_frame_path} does not exist".format(
-                source_frame_path=source_frame_path
-            )
-            if os.path.lexists(str(segmented_frame_path)):
-                os.remove(str(segmented_frame_path))
-            source_frame_relative_path = os.path.relpath(
-                str(source_frame_path), start=str(segment_dir)
+                source_frame_path=video_dir.joinpath(source_frame_filename)
             )
+            try:
+                os.unlink(target_frame_filename, dir_fd=segment_dir_fd)
+            except FileNotFoundError:
+                pass
             os.symlink(
-                str(source_frame_relative_path),
-                str(segmented_frame_path),
+                source_dir_relative_path + os.sep + source_frame_filename,
+                target_frame_filename,
                 dir_fd=segment_dir_fd,
             )
             last_frame_index = frame_index
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+
+from epic_kitchens.gulp.__main__ import main, parser
+from gulpio.dataset import GulpDirectory
+
+from tests import ANNOTATIONS_DIR, SEGMENT_DIR
+
+# Reading the annotation CSVs is pure setup shared by every gulp test, so
+# parse each file once per session instead of once per test. Presetting the
+# dtypes skips pandas' per-column type inference pass.
+_LABEL_DTYPES = {
+    "participant_id": str,
+    "video_id": str,
+    "narration": str,
+    "verb": str,
+    "verb_class": "int64",
+    "noun": str,
+    "noun_class": "int64",
+}
+
+
+@pytest.fixture(scope="session")
+def train_action_labels():
+    return pd.read_csv(
+        ANNOTATIONS_DIR / "EPIC_train_action_labels.csv",
+        index_col="uid",
+        dtype=_LABEL_DTYPES,
+    )
+
+
+@pytest.fixture(scope="session")
+def test_s1_timestamps():
+    return pd.read_csv(
+        ANNOTATIONS_DIR / "EPIC_test_s1_timestamps.csv",
+        index_col="uid",
+        dtype={"participant_id": str, "video_id": str},
+    )
+
+
+def gulp(segment_root_dir, gulp_dir, label_path, modality, labelled):
+    main(
+        parser.parse_args(
+            [str(segment_root_dir), str(gulp_dir), str(label_path), modality]
+            + (["--unlabelled"] if not labelled else [])
+        )
+    )
+
+
+def _gulped_directory(tmpdir_factory, modality, annotations_file, labelled):
+    suffix = "labelled" if labelled else "unlabelled"
+    gulp_dir_path = tmpdir_factory.mktemp(
+        "{}_{}_gulped".format(modality, suffix)
+    )
+    gulp(
+        SEGMENT_DIR / modality,
+        gulp_dir_path,
+        ANNOTATIONS_DIR / annotations_file,
+        modality,
+        labelled,
+    )
+    return GulpDirectory(str(gulp_dir_path))
+
+
+# Gulping re-encodes every frame of every segment and is the dominant cost
+# of the system suite, so each (modality, labelled) configuration is gulped
+# once per session and shared by the tests that assert over it.
+@pytest.fixture(scope="session")
+def gulped_rgb_labelled(tmpdir_factory):
+    return _gulped_directory(
+        tmpdir_factory, "rgb", "EPIC_train_action_labels.csv", True
+    )
+
+
+@pytest.fixture(scope="session")
+def gulped_rgb_unlabelled(tmpdir_factory):
+    return _gulped_directory(
+        tmpdir_factory, "rgb", "EPIC_test_s1_timestamps.csv", False
+    )
+
+
+@pytest.fixture(scope="session")
+def gulped_flow_labelled(tmpdir_factory):
+    return _gulped_directory(
+        tmpdir_factory, "flow", "EPIC_train_action_labels.csv", True
+    )
+
+
+@pytest.fixture(scope="session")
+def gulped_flow_unlabelled(tmpdir_factory):
+    return _gulped_directory(
+        tmpdir_factory, "flow", "EPIC_test_s1_timestamps.csv", False
+    )
@@ -17,9 +17,9 @@ def test_descriptions_has_video_id_index(descriptions):
     assert descriptions.index.name == "video_id"
 
 
-@pytest.mark.parametrize("col", ["datetime", "description"])
-def test_description_has_columns(col, descriptions):
-    assert col in descriptions.columns
+def test_description_has_columns(descriptions):
+    missing = {"datetime", "description"} - set(descriptions.columns)
+    assert not missing, missing
 
 
 def test_descriptions_reads_date_and_time_to_datetime(descriptions):
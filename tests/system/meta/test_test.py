@@ -42,14 +42,14 @@ def test_all_timestamps_is_as_long_as_sum_of_both_timestamp_splits(
     )
 
 
-timestamp_columns = ["video_id", "start_timestamp", "stop_timestamp", "participant_id"]
+timestamp_columns = {"video_id", "start_timestamp", "stop_timestamp", "participant_id"}
 
 
-@pytest.mark.parametrize("col", timestamp_columns)
-def test_seen_timestamp_has_column(col, test_seen_timestamps):
-    assert col in test_seen_timestamps.columns
+def test_seen_timestamp_has_columns(test_seen_timestamps):
+    missing = timestamp_columns - set(test_seen_timestamps.columns)
+    assert not missing, missing
 
 
-@pytest.mark.parametrize("col", timestamp_columns)
-def test_unseen_timestamp_has_column(col, test_unseen_timestamps):
-    assert col in test_unseen_timestamps.columns
+def test_unseen_timestamp_has_columns(test_unseen_timestamps):
+    missing = timestamp_columns - set(test_unseen_timestamps.columns)
+    assert not missing, missing
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from epic_kitchens.preprocessing.split_segments import main, parser
@@ -14,10 +15,8 @@ def test_splitting_labelled_rgb(tmpdir):
 
     split_actions(video_id, frame_dir, p01_01_dir, annotations_path, modality)
 
-    assert (p01_01_dir / "P01_01_0_open-door" / "frame_0000000001.jpg").exists()
-    assert (p01_01_dir / "P01_01_0_open-door" / "frame_0000000194.jpg").exists()
-    assert (p01_01_dir / "P01_01_10_open-drawer" / "frame_0000000001.jpg").exists()
-    assert (p01_01_dir / "P01_01_10_open-drawer" / "frame_0000000074.jpg").exists()
+    assert_frames_exist(p01_01_dir / "P01_01_0_open-door", [1, 194])
+    assert_frames_exist(p01_01_dir / "P01_01_10_open-drawer", [1, 74])
 
 
 def test_splitting_unlabelled_rgb(tmpdir):
@@ -31,12 +30,10 @@ def test_splitting_unlabelled_rgb(tmpdir):
     split_actions(video_id, frame_dir, p01_11_dir, annotations_path, modality)
 
     assert (p01_11_dir / "P01_11_1924_unnarrated").exists()
-    assert (p01_11_dir / "P01_11_1924_unnarrated" / "frame_0000000001.jpg").exists()
-    assert (p01_11_dir / "P01_11_1924_unnarrated" / "frame_0000000112.jpg").exists()
+    assert_frames_exist(p01_11_dir / "P01_11_1924_unnarrated", [1, 112])
 
     assert (p01_11_dir / "P01_11_1930_unnarrated").exists()
-    assert (p01_11_dir / "P01_11_1930_unnarrated" / "frame_0000000001.jpg").exists()
-    assert (p01_11_dir / "P01_11_1930_unnarrated" / "frame_0000000407.jpg").exists()
+    assert_frames_exist(p01_11_dir / "P01_11_1930_unnarrated", [1, 407])
 
 
 def test_splitting_labelled_flow(tmpdir):
@@ -50,18 +47,8 @@ def test_splitting_labelled_flow(tmpdir):
     split_actions(video_id, frame_dir, p01_01_dir, annotations_path, modality)
 
     for axis in "u", "v":
-        assert (
-            p01_01_dir / axis / "P01_01_0_open-door" / "frame_0000000001.jpg"
-        ).exists()
-        assert (
-            p01_01_dir / axis / "P01_01_0_open-door" / "frame_0000000097.jpg"
-        ).exists()
-        assert (
-            p01_01_dir / axis / "P01_01_10_open-drawer" / "frame_0000000001.jpg"
-        ).exists()
-        assert (
-            p01_01_dir / axis / "P01_01_10_open-drawer" / "frame_0000000037.jpg"
-        ).exists()
+        assert_frames_exist(p01_01_dir / axis / "P01_01_0_open-door", [1, 97])
+        assert_frames_exist(p01_01_dir / axis / "P01_01_10_open-drawer", [1, 37])
 
 
 def test_splitting_unlabelled_flow(tmpdir):
@@ -75,20 +62,24 @@ def test_splitting_unlabelled_flow(tmpdir):
     split_actions(video_id, frame_dir, p01_11_dir, annotations_path, modality)
 
     for axis in "u", "v":
-        assert (
-            p01_11_dir / axis / "P01_11_1924_unnarrated" / "frame_0000000001.jpg"
-        ).exists()
-        assert (
-            p01_11_dir / axis / "P01_11_1924_unnarrated" / "frame_0000000056.jpg"
-        ).exists()
+        assert_frames_exist(p01_11_dir / axis / "P01_11_1924_unnarrated", [1, 56])
 
         assert (p01_11_dir / axis / "P01_11_1930_unnarrated").exists()
-        assert (
-            p01_11_dir / axis / "P01_11_1930_unnarrated" / "frame_0000000001.jpg"
-        ).exists()
-        assert (
-            p01_11_dir / axis / "P01_11_1930_unnarrated" / "frame_0000000204.jpg"
-        ).exists()
+        assert_frames_exist(p01_11_dir / axis / "P01_11_1930_unnarrated", [1, 204])
+
+
+def frame_name(index):
+    return "frame_%010d.jpg" % index
+
+
+def assert_frames_exist(segment_dir, frame_indices):
+    """Assert the expected frame links exist using one directory listing
+    rather than a stat syscall per path."""
+    # Plain iteration, not a context manager: scandir only supports the
+    # latter from python 3.6 and this suite still runs on 3.5.
+    present = {entry.name for entry in os.scandir(str(segment_dir))}
+    missing = {frame_name(index) for index in frame_indices} - present
+    assert not missing, missing
 
 
 def split_actions(video_id, frame_dir, segment_dir, annotations_path, modality):
@@ -62,6 +62,20 @@ class TestHttpFolder:
 
         loaders[file_name].assert_called_once_with(http_folder.local_dir / file_name)
 
+    def test_setting_new_local_dir_clears_cached_files(self, http_folder):
+        http_folder.load_file(file_name)
+
+        http_folder.local_dir = http_folder.local_dir / "other"
+
+        assert http_folder.files == {}
+
+    def test_setting_same_local_dir_keeps_cached_files(self, http_folder):
+        http_folder.load_file(file_name)
+
+        http_folder.local_dir = http_folder.local_dir
+
+        assert file_name in http_folder.files
+
     def test_load_file_creates_parent_dir_if_it_doesnt_exist(
         self, monkeypatch, http_folder
     ):
@@ -105,6 +119,23 @@ class TestAnnotationRepository:
         repo = AnnotationRepository(version=version)
         assert repo.http_folder.base_url.endswith(version + "/")
 
+    def test_setting_new_local_dir_resets_inverse_lookups(self):
+        repo = AnnotationRepository()
+        repo.inverse_lookups["verb"] = {"open": 2}
+        repo.inverse_lookups["noun"] = {"door": 3}
+
+        repo.local_dir = repo.local_dir / "other"
+
+        assert repo.inverse_lookups == {"verb": None, "noun": None}
+
+    def test_setting_same_local_dir_keeps_inverse_lookups(self):
+        repo = AnnotationRepository()
+        repo.inverse_lookups["verb"] = {"open": 2}
+
+        repo.local_dir = repo.local_dir
+
+        assert repo.inverse_lookups["verb"] == {"open": 2}
+
     def test_uses_XDG_CACHE_HOME_if_set_for_storage_location(self, monkeypatch):
         cache_dir = "/home/will/.mycache"
         with monkeypatch.context() as ctx:
@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 import pytest
+from numpy.testing import assert_array_equal
 
 from epic_kitchens.metrics import precision_recall, topk_accuracy, compute_metrics
 
@@ -11,29 +12,29 @@ class TestPrecision:
         labels = np.array([1, 2, 3])
         precision, _ = precision_recall(ranks, labels)
 
-        assert np.all(precision == np.array([1, 1, 1]))
+        assert_array_equal(precision, np.array([1, 1, 1]))
 
     def test_all_fp(self):
         ranks = np.array([[1, 2, 3], [2, 3, 1], [3, 1, 2]])
         labels = np.array([3, 1, 2])
         precision, _ = precision_recall(ranks, labels)
 
-        assert np.all(precision == np.array([0, 0, 0]))
+        assert_array_equal(precision, np.array([0, 0, 0]))
 
     def test_no_fp_and_no_tp(self):
         ranks = np.array([[4, 2, 3], [4, 3, 1], [4, 1, 2]])
         labels = np.array([3, 1, 2])
         precision, _ = precision_recall(ranks, labels)
 
-        assert np.all(precision == np.array([0, 0, 0]))
+        assert_array_equal(precision, np.array([0, 0, 0]))
 
     def test_filter_existing_class(self):
         ranks = np.array([[1, 2, 3], [2, 3, 1], [3, 1, 2]])
         labels = np.array([1, 2, 3])
         precision, recall = precision_recall(ranks, labels, classes=np.array([1]))
 
-        assert np.all(precision == np.array([1]))
-        assert np.all(recall == np.array([1]))
+        assert_array_equal(precision, np.array([1]))
+        assert_array_equal(recall, np.array([1]))
 
     def test_filter_nonexisting_class(self):
         ranks = np.array([[1, 2, 3], [2, 3, 1], [3, 1, 2]])
@@ -57,7 +58,7 @@ class TestRecall:
 
         _, recall = precision_recall(ranks, labels)
 
-        assert np.all(recall == np.array([1, 1, 1]))
+        assert_array_equal(recall, np.array([1, 1, 1]))
 
     def test_all_fn(self):
         ranks = np.array([[1, 2, 3], [2, 3, 1], [3, 1, 2]])
@@ -65,41 +66,30 @@ class TestRecall:
 
         _, recall = precision_recall(ranks, labels)
 
-        assert np.all(recall == np.array([0, 0, 0]))
+        assert_array_equal(recall, np.array([0, 0, 0]))
 
 
-class TestAccuracyAtK:
-    def test_at_1(self):
-        ranks = np.array([[1, 2, 3], [2, 3, 1], [3, 1, 2]])
-        labels = np.array([1, 2, 3])
-
-        accuracy = topk_accuracy(ranks, labels, ks=1)
-
-        assert accuracy == 1
-
-    def test_at_2(self):
-        ranks = np.array([[1, 2, 3], [2, 3, 1], [3, 1, 2], [1, 2, 3]])
-        labels = np.array([1, 3, 2, 1])
-
-        accuracy = topk_accuracy(ranks, labels, ks=2)
+# Shared across the TestAccuracyAtK cases; built once at module level rather
+# than re-created per test.
+_ACCURACY_RANKS = np.array([[1, 2, 3], [2, 3, 1], [3, 1, 2], [1, 2, 3]])
+_ACCURACY_LABELS = np.array([1, 3, 2, 1])
 
-        assert accuracy == 0.75
 
-    def test_at_3(self):
-        ranks = np.array([[1, 2, 3], [2, 3, 1], [3, 1, 2], [1, 2, 3]])
-        labels = np.array([1, 3, 2, 1])
-
-        accuracy = topk_accuracy(ranks, labels, ks=3)
-
-        assert accuracy == 1
-
-    def test_at_1_and_3(self):
-        ranks = np.array([[1, 2, 3], [2, 3, 1], [3, 1, 2], [1, 2, 3]])
-        labels = np.array([1, 3, 2, 1])
-
-        accuracy = topk_accuracy(ranks, labels, ks=(1, 3, 5))
+class TestAccuracyAtK:
+    @pytest.mark.parametrize(
+        "ranks,labels,ks,expected",
+        [
+            (_ACCURACY_RANKS[:3], np.array([1, 2, 3]), 1, 1),
+            (_ACCURACY_RANKS, _ACCURACY_LABELS, 2, 0.75),
+            (_ACCURACY_RANKS, _ACCURACY_LABELS, 3, 1),
+            (_ACCURACY_RANKS, _ACCURACY_LABELS, (1, 3, 5), np.array([0.5, 1, 1])),
+        ],
+        ids=["at_1", "at_2", "at_3", "at_1_3_and_5"],
+    )
+    def test_accuracy_at_k(self, ranks, labels, ks, expected):
+        accuracy = topk_accuracy(ranks, labels, ks=ks)
 
-        assert np.all(accuracy == np.array([0.5, 1, 1]))
+        assert_array_equal(accuracy, expected)
 
 
 class TestComputeMetrics:
@@ -132,47 +122,51 @@ class TestComputeMetrics:
     many_shot_nouns = [0, 1]
     many_shot_actions = [(0, 0), (1, 1)]
 
-    metrics = compute_metrics(
-        groundtruth_df,
-        scores,
-        many_shot_verbs=many_shot_verbs,
-        many_shot_nouns=many_shot_nouns,
-        many_shot_actions=many_shot_actions,
-    )
+    # Computed once per class rather than at import time, so collecting the
+    # module doesn't run the full scoring pipeline.
+    @pytest.fixture(scope="class")
+    def metrics(self):
+        return compute_metrics(
+            self.groundtruth_df,
+            self.scores,
+            many_shot_verbs=self.many_shot_verbs,
+            many_shot_nouns=self.many_shot_nouns,
+            many_shot_actions=self.many_shot_actions,
+        )
 
-    def test_verb_accuracy_at_1(self):
-        assert self.metrics["accuracy"]["verb"][0] == (2 / 4)
+    def test_verb_accuracy_at_1(self, metrics):
+        assert metrics["accuracy"]["verb"][0] == (2 / 4)
 
-    def test_verb_accuracy_at_5(self):
-        assert self.metrics["accuracy"]["verb"][1] == 1
+    def test_verb_accuracy_at_5(self, metrics):
+        assert metrics["accuracy"]["verb"][1] == 1
 
-    def test_noun_accuracy_at_1(self):
-        assert self.metrics["accuracy"]["noun"][0] == (2 / 4)
+    def test_noun_accuracy_at_1(self, metrics):
+        assert metrics["accuracy"]["noun"][0] == (2 / 4)
 
-    def test_noun_accuracy_at_5(self):
-        assert self.metrics["accuracy"]["noun"][1] == 1
+    def test_noun_accuracy_at_5(self, metrics):
+        assert metrics["accuracy"]["noun"][1] == 1
 
-    def test_action_accuracy_at_1(self):
-        assert self.metrics["accuracy"]["action"][0] == (1 / 4)
+    def test_action_accuracy_at_1(self, metrics):
+        assert metrics["accuracy"]["action"][0] == (1 / 4)
 
-    def test_action_accuracy_at_5(self):
+    def test_action_accuracy_at_5(self, metrics):
         # the first entry has the correct entry at place 6
-        assert self.metrics["accuracy"]["action"][1] == (3 / 4)
+        assert metrics["accuracy"]["action"][1] == (3 / 4)
 
-    def test_verb_precision(self):
-        assert self.metrics["precision"]["verb"] == ((1 / 2) + (1 / 2)) / 2
+    def test_verb_precision(self, metrics):
+        assert metrics["precision"]["verb"] == ((1 / 2) + (1 / 2)) / 2
 
-    def test_verb_recall(self):
-        assert self.metrics["recall"]["verb"] == ((1 / 2) + (1 / 2)) / 2
+    def test_verb_recall(self, metrics):
+        assert metrics["recall"]["verb"] == ((1 / 2) + (1 / 2)) / 2
 
-    def test_noun_precision(self):
-        assert self.metrics["precision"]["noun"] == (0 + (1 / 2)) / 2
+    def test_noun_precision(self, metrics):
+        assert metrics["precision"]["noun"] == (0 + (1 / 2)) / 2
 
-    def test_noun_recall(self):
-        assert self.metrics["recall"]["noun"] == (0 + (1 / 1)) / 2
+    def test_noun_recall(self, metrics):
+        assert metrics["recall"]["noun"] == (0 + (1 / 1)) / 2
 
-    def test_action_recall(self):
-        assert self.metrics["recall"]["action"] == ((0 / 2) + (1 / 1)) / 2
+    def test_action_recall(self, metrics):
+        assert metrics["recall"]["action"] == ((0 / 2) + (1 / 1)) / 2
 
-    def test_action_precision(self):
-        assert self.metrics["precision"]["action"] == (0 + (1 / 1)) / 2
+    def test_action_precision(self, metrics):
+        assert metrics["precision"]["action"] == (0 + (1 / 1)) / 2
@@ -2,7 +2,7 @@ import numpy as np
 import pytest
 from numpy.testing import assert_array_equal
 
-from epic_kitchens.scoring import compute_action_scores
+from epic_kitchens.scoring import compute_action_scores, compute_action_scores_cached
 
 
 class TestComputeActionScores:
@@ -34,6 +34,66 @@ class TestComputeActionScores:
             verbose=True,
         )
 
+    def test_approximate_action_scores_with_indivisible_buckets(self):
+        # 3 verbs x 3 nouns = 9 candidates over 5 buckets: the last bucket is
+        # partially padding, which must never surface in the decoded classes.
+        verb_scores = np.array([[0.2, 0.5, 0.3], [0.7, 0.1, 0.2]])
+        noun_scores = np.array([[0.1, 0.2, 0.7], [0.2, 0.7, 0.1]])
+        ((exact_verbs, exact_nouns), _) = compute_action_scores(
+            verb_scores, noun_scores, top_k=5
+        )
+        ((verbs, nouns), action_scores) = compute_action_scores(
+            verb_scores, noun_scores, top_k=5, approximate=True
+        )
+        assert np.all((verbs >= 0) & (verbs < verb_scores.shape[1]))
+        assert np.all((nouns >= 0) & (nouns < noun_scores.shape[1]))
+        assert np.all(action_scores[:, :-1] >= action_scores[:, 1:])
+        # The global maximum is also the maximum of its bucket, so the top-1
+        # action is always exact.
+        assert_array_equal(verbs[:, 0], exact_verbs[:, 0], verbose=True)
+        assert_array_equal(nouns[:, 0], exact_nouns[:, 0], verbose=True)
+
+    def test_approximate_action_scores_fall_back_when_a_bucket_would_be_all_padding(
+        self
+    ):
+        # 2 verbs x 3 nouns = 6 candidates over 4 buckets of width 2 leaves
+        # the last bucket entirely padding, so the exact selection is used.
+        ((exact_verbs, exact_nouns), exact_scores) = compute_action_scores(
+            self.verb_scores, self.noun_scores, top_k=4
+        )
+        ((verbs, nouns), action_scores) = compute_action_scores(
+            self.verb_scores, self.noun_scores, top_k=4, approximate=True
+        )
+        assert_array_equal(verbs, exact_verbs, verbose=True)
+        assert_array_equal(nouns, exact_nouns, verbose=True)
+        assert_array_equal(action_scores, exact_scores, verbose=True)
+
+    def test_cached_action_scores_match_uncached(self):
+        ((verbs, nouns), action_scores) = compute_action_scores(
+            self.verb_scores, self.noun_scores, top_k=3
+        )
+        compute_action_scores_cached.cache_clear()
+        for _ in range(2):
+            ((cached_verbs, cached_nouns), cached_scores) = compute_action_scores_cached(
+                self.verb_scores, self.noun_scores, top_k=3
+            )
+            assert_array_equal(cached_verbs, verbs, verbose=True)
+            assert_array_equal(cached_nouns, nouns, verbose=True)
+            assert_array_equal(cached_scores, action_scores, verbose=True)
+        assert compute_action_scores_cached.cache_info().hits == 1
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_action_scores_are_computed_in_single_precision(self, dtype):
+        ((verbs, nouns), action_scores) = compute_action_scores(
+            self.verb_scores.astype(dtype), self.noun_scores.astype(dtype), top_k=3
+        )
+        assert action_scores.dtype == np.float32
+        assert_array_equal(
+            verbs,
+            np.array([[1, 1, 1], [0, 0, 0], [1, 0, 1], [1, 1, 1], [1, 1, 1]]),
+            verbose=True,
+        )
+
     def test_action_scores_with_priors(self):
         priors = np.array([[1e-8, 0, 1], [1, 0, 1e-16]])
         ((verbs, nouns), action_scores) = compute_action_scores(